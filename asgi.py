@@ -0,0 +1,209 @@
+"""Optional async serving mode.
+
+    pip install asgiref uvicorn aiosqlite   (or aiomysql for MySQL)
+    uvicorn --factory asgi:create_asgi_app --workers 4
+
+The plain read routes (GET /customers, /products, /orders, their /<id> forms
+and /orders/<id>/products) run as async handlers on an async SQLAlchemy engine,
+so one worker can overlap many database round trips. They return the same
+bytes and share the response cache and ETags with the sync routes, building
+their queries and error bodies with the same helpers from main.py. Every
+other request (writes, filtered or sorted lists, ?expand=, ?stream=, reports,
+/metrics ...) is handed to the regular Flask app through asgiref's WSGI
+adapter, on a pool of ASYNC_WSGI_THREADS threads (default 32) per worker, so
+a long ?stream= only ties up one of them.
+
+With DATABASE_REPLICA_URL set, the async handlers read from an async engine on
+the replica, falling back to the primary within REPLICA_MAX_LAG of a write,
+like the sync routes. They report to the same /metrics and send the same
+Server-Timing header. /metrics/pool lists the async engines' pools as
+'async_primary' and 'async_replica'. /health/db only checks the sync engines;
+the async ones connect to the same databases.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from sqlalchemy.engine import make_url
+from werkzeug.datastructures import MultiDict
+from flask import g
+from werkzeug.http import parse_etags
+
+from cache import cache_key, get_cache, pack, recently_written, unpack
+from database import engine_options
+from instrumentation import RequestStats, serialization_timer
+from main import NOT_FOUND, ORDER_PRODUCTS_NOT_FOUND, create_app, dump_order_products, order_products_query, page_body, page_query
+from models import Customer, Orders, Products
+from schemas import row_serializer
+from serializers import json_response
+
+# async driver used in place of each sync one
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'mysql': 'mysql+aiomysql'}
+
+
+def async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+# asgiref's WsgiToAsgi runs every request on one shared thread (sync_to_async's thread_sensitive default);
+# this runs each on `executor` instead, so the Flask requests of one worker run concurrently
+def threaded_wsgi(app, executor):
+    from asgiref.sync import sync_to_async
+    from asgiref.wsgi import WsgiToAsgiInstance
+
+    class Instance(WsgiToAsgiInstance):
+        run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, thread_sensitive=False, executor=executor)
+
+    async def wsgi(scope, receive, send):
+        await Instance(app)(scope, receive, send)
+    return wsgi
+
+
+# Build the ASGI app: async read routes in front of create_app(config)
+def create_asgi_app(config=None):
+    return AsyncAPI(create_app(config))
+
+
+class AsyncAPI:
+    def __init__(self, app):
+        from sqlalchemy.ext.asyncio import create_async_engine # optional dependencies, only needed for the async mode
+
+        self.app = app
+        self.executor = ThreadPoolExecutor(app.config.get('ASYNC_WSGI_THREADS', 32), thread_name_prefix='wsgi')
+        self.wsgi = threaded_wsgi(app, self.executor)
+        self.instrumentation = app.extensions.get('instrumentation') # None with INSTRUMENTATION off
+
+        def async_engine(url):
+            options = {key: value for key, value in engine_options(url).items() if key != 'poolclass'} # async engines need an async-adapted pool
+            return create_async_engine(async_url(url), **options)
+
+        self.engine = async_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+        replica_url = app.config['DATABASE_REPLICA_URL']
+        self.replica = async_engine(replica_url) if replica_url else None
+        app.extensions['async_engines'] = {'async_primary': self.engine, **({'async_replica': self.replica} if self.replica else {})} # for /metrics/pool
+
+        # (Flask rule, path pattern, handler, model, cache namespaces) - mirrors the @cached GET routes in main.py
+        self.routes = [
+            ('/customers', re.compile(r'/customers'), self.list_page, Customer, ('customer',)),
+            ('/customers/<int:id>', re.compile(r'/customers/(\d+)'), self.get_one, Customer, ('customer',)),
+            ('/products', re.compile(r'/products'), self.list_page, Products, ('products',)),
+            ('/products/<int:id>', re.compile(r'/products/(\d+)'), self.get_one, Products, ('products',)),
+            ('/orders', re.compile(r'/orders'), self.list_page, Orders, ('orders', 'products', 'customer')),
+            ('/orders/<int:id>', re.compile(r'/orders/(\d+)'), self.get_one, Orders, ('orders', 'products', 'customer')),
+            ('/orders/<int:order_id>/products', re.compile(r'/orders/(\d+)/products'), self.order_products, Products, ('orders', 'products')),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+            for rule, pattern, handler, model, namespaces in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    allowed = {'after_id', 'limit'} if handler == self.list_page else set()
+                    if args.keys() <= allowed: # anything else (?expand=, ?stream=, filters, ?sort=) is handled by the sync route
+                        return await self.handle(scope, send, args, rule, namespaces, handler, model, *map(int, match.groups()))
+                    break
+
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                if self.replica is not None:
+                    await self.replica.dispose()
+                self.executor.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # Run one async route inside an app context, timed like a sync request when instrumentation is on
+    async def handle(self, scope, send, args, rule, namespaces, handler, model, *params):
+        with self.app.app_context(): # contextvars are per task, so this context stays with this request across awaits
+            stats = g.perf_stats = RequestStats()
+            status, mimetype, body, etag = await self.cached(scope, args, namespaces, handler, model, *params)
+            timing = self.instrumentation.finish('GET', rule, status, stats, len(body)) if self.instrumentation else None
+        await self.send(send, status, mimetype, body, etag, timing)
+
+    # Same behaviour as cache.cached(): serve from the cache when possible, 304 on a matching If-None-Match.
+    # Returns (status, mimetype, body, etag)
+    async def cached(self, scope, args, namespaces, handler, model, *params):
+        cache = get_cache()
+        key = cache_key(scope['path'], args.items(multi=True), namespaces, cache.generations(namespaces))
+        entry = cache.get(key)
+
+        if entry is None:
+            # the replica, unless it may not have a recent write yet (see cache.cached)
+            engine = self.engine if self.replica is None or recently_written(cache, namespaces) else self.replica
+            status, payload, float_values = await handler(engine, model, args, *params)
+            response = json_response(payload, float_values)
+            if status != 200:
+                return status, response.mimetype, response.get_data(), None
+            entry = pack(response.get_data(), response.mimetype)
+            cache.set(key, entry)
+
+        etag, mimetype, body = unpack(entry)
+        if_none_match = dict(scope['headers']).get(b'if-none-match')
+        if if_none_match and parse_etags(if_none_match.decode('latin-1')).contains(etag):
+            return 304, None, b'', etag
+        return 200, mimetype, body, etag
+
+    async def send(self, send, status, mimetype, body, etag=None, timing=None):
+        headers = [(b'content-length', str(len(body)).encode())]
+        if mimetype:
+            headers.append((b'content-type', mimetype.encode()))
+        if etag:
+            headers.append((b'etag', f'"{etag}"'.encode()))
+        if timing:
+            headers.append((b'server-timing', timing.encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def fetch_all(self, engine, query):
+        start = time.perf_counter()
+        async with engine.connect() as connection:
+            rows = (await connection.execute(query)).all()
+        if self.instrumentation:
+            self.instrumentation.record_query(time.perf_counter() - start, query)
+        return rows
+
+    #========== ASYNC VIEWS ==========
+
+    # GET /customers, /products, /orders - same keyset page as main.paginate() (only reached without ?sort= or filters)
+    async def list_page(self, engine, model, args):
+        serializer = row_serializer(model)
+        try:
+            query, name, limit = page_query(serializer.select(), model, args)
+        except ValueError as e:
+            return 400, {"Error": str(e)}, ()
+        rows = await self.fetch_all(engine, query)
+
+        with serialization_timer():
+            items = serializer.dump_rows(rows[:limit])
+        return 200, page_body(rows, items, name, limit), serializer.float_values(items)
+
+    # GET /customers/<id>, /products/<id>, /orders/<id>
+    async def get_one(self, engine, model, args, id):
+        serializer = row_serializer(model)
+        rows = await self.fetch_all(engine, serializer.select().where(model.id == id))
+        if not rows:
+            return 404, {"Error": NOT_FOUND[model]}, ()
+        with serialization_timer():
+            item = serializer.dump_row(rows[0])
+        return 200, item, serializer.float_values([item])
+
+    # GET /orders/<id>/products - same single outer-join query as main.get_order_products()
+    async def order_products(self, engine, model, args, order_id):
+        serializer = row_serializer(Products)
+        rows = await self.fetch_all(engine, order_products_query(serializer, order_id))
+        if not rows:
+            return 404, ORDER_PRODUCTS_NOT_FOUND, ()
+        products = dump_order_products(serializer, rows)
+        return 200, products, serializer.float_values(products)
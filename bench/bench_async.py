@@ -0,0 +1,133 @@
+"""Load-test the sync (threaded WSGI) and async (uvicorn + aiosqlite) serving modes.
+
+    python bench/bench_async.py [--clients 100] [--seconds 10] [--rows 10000]
+
+Seeds a SQLite file, starts each server in its own process with the response
+cache disabled (so every request reaches the database), drives the read routes
+with N concurrent clients and prints requests/sec and latency percentiles.
+Needs the async extras: pip install asgiref uvicorn aiosqlite
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYNC_SERVER = """
+import sys
+from werkzeug.serving import make_server
+from main import create_app
+make_server('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True).serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed(url, rows):
+    from datetime import date
+    from sqlalchemy import insert
+    from main import create_app
+    from models import Customer, Orders, Products, db, order_products
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url})
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Customer), [{"name": f"c{i}", "email": f"c{i}@example.com", "address": "addr"} for i in range(rows)])
+        db.session.execute(insert(Products), [{"product_name": f"p{i}", "price": i * 0.5} for i in range(rows)])
+        db.session.execute(insert(Orders), [{"order_date": date(2024, 1, 1), "customer_id": i % rows + 1} for i in range(rows)])
+        db.session.execute(insert(order_products), [{"order_id": i + 1, "product_id": (i * 7 + k) % rows + 1} for i in range(rows) for k in range(3)])
+        db.session.commit()
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    data = await reader.read() # server closes the connection after the response
+    writer.close()
+    return int(data.split(b' ', 2)[1])
+
+
+async def load(port, paths, clients, seconds):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await get(port, random.choice(paths))
+            except OSError:
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors, time.monotonic() - start
+
+
+def run_mode(name, command, port, env, paths, args):
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        latencies, errors, elapsed = asyncio.run(load(port, paths, args.clients, args.seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    print(f"{name:>5}: {len(latencies) / elapsed:8.1f} req/s  p50 {quantiles[49] * 1000:7.1f} ms  "
+          f"p95 {quantiles[94] * 1000:7.1f} ms  errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    seed(url, args.rows)
+    env = {**os.environ, 'DATABASE_URL': url, 'FLASK_CACHE_BACKEND': 'none', 'FLASK_INSTRUMENTATION': 'false'}
+    paths = (['/products?limit=50', '/customers?limit=50'] +
+             [f'/orders/{random.randint(1, args.rows)}/products' for _ in range(50)] +
+             [f'/customers/{random.randint(1, args.rows)}' for _ in range(50)])
+
+    print(f"{args.clients} concurrent clients, {args.seconds:g}s per mode, {args.rows} rows per table")
+    port = free_port()
+    run_mode('sync', [sys.executable, '-c', SYNC_SERVER, str(port)], port, env, paths, args)
+    port = free_port()
+    run_mode('async', [sys.executable, '-m', 'uvicorn', '--factory', 'asgi:create_asgi_app',
+                       '--port', str(port), '--log-level', 'warning'], port, env, paths, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Compare client-side revenue reporting with the server-side aggregate endpoints.
+
+    python bench/bench_reports.py [orders] [products per order]   (default: 5000 3)
+
+Seeds a throwaway SQLite database and computes revenue per customer three ways:
+
+  client   pages through GET /orders, calls GET /orders/<id>/products for
+           every order and sums the prices itself (the old way)
+  live     GET /reports/sales?group_by=customer, one GROUP BY over the order tables
+  summary  the same endpoint reading the order_totals summary table
+
+It prints the HTTP requests, SQL statements and time each way takes, and checks
+that all three produce the same numbers. The response cache is off, so every
+request reaches the database.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert # noqa: E402
+
+from instrumentation import count_queries # noqa: E402
+from main import create_app # noqa: E402
+from models import Customer, Orders, Products, db, order_products # noqa: E402
+from reports import rebuild_order_totals # noqa: E402
+
+
+def seed(orders, per_order):
+    random.seed(0)
+    customers, products = max(1, orders // 20), 500
+    start = date(2024, 1, 1)
+    db.session.execute(insert(Customer), [{"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(customers)])
+    db.session.execute(insert(Products), [{"product_name": f"product {i}", "price": round(random.uniform(1, 100), 2)} for i in range(products)])
+    db.session.execute(insert(Orders), [{"order_date": start + timedelta(days=i % 365), "customer_id": 1 + i % customers} for i in range(orders)])
+    db.session.execute(insert(order_products), [{"order_id": order_id, "product_id": product_id}
+                                                for order_id in range(1, orders + 1)
+                                                for product_id in random.sample(range(1, products + 1), per_order)])
+    db.session.commit()
+    rebuild_order_totals()
+
+
+# The old way: every order, then every order's products, summed by the client
+def client_side(client):
+    revenue, requests, after_id = {}, 0, None
+    while True:
+        page = client.get('/orders', query_string={'limit': 500, **({'after_id': after_id} if after_id else {})}).json
+        requests += 1
+        for order in page['items']:
+            products = client.get(f"/orders/{order['id']}/products").json
+            requests += 1
+            revenue[order['customer_id']] = revenue.get(order['customer_id'], 0) + sum(product['price'] for product in products)
+        after_id = page['next']
+        if after_id is None:
+            return {id: round(total, 2) for id, total in revenue.items()}, requests
+
+
+def server_side(client):
+    rows = client.get('/reports/sales', query_string={'group_by': 'customer'}).json['rows']
+    return {row['customer_id']: row['revenue'] for row in rows}, 1
+
+
+def measure(app, fn):
+    client = app.test_client()
+    with app.app_context(), count_queries(db.engine) as queries:
+        start = time.perf_counter()
+        result, requests = fn(client)
+        elapsed = time.perf_counter() - start
+    return result, requests, queries.count, elapsed
+
+
+def main(orders, per_order):
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{DB_FILE}', 'CACHE_BACKEND': 'none', 'INSTRUMENTATION': False}
+    live = create_app(config)
+    summary = create_app({**config, 'ORDER_TOTALS_SUMMARY': True})
+    with live.app_context():
+        db.create_all()
+        seed(orders, per_order)
+
+    print(f"{orders} orders x {per_order} products, revenue per customer")
+    expected = None
+    for name, app, fn in (('client', live, client_side), ('live', live, server_side), ('summary', summary, server_side)):
+        result, requests, queries, elapsed = measure(app, fn)
+        expected = expected or result
+        status = 'same' if result == expected else 'MISMATCH'
+        print(f"{name:>8}  {requests:>6} requests  {queries:>6} SQL statements  {elapsed * 1000:9.1f} ms  ({status})")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [5000, 3][len(args):]))
@@ -0,0 +1,617 @@
+"""Benchmark every route in main.py and flag regressions between runs.
+
+    python bench/bench_routes.py [--scale 1k|100k|1m] [--mode client|server|both]
+                                 [--requests 200] [--threads 8] [--output FILE]
+                                 [--baseline FILE] [--threshold 0.25]
+    python bench/bench_routes.py --diff OLD.json NEW.json
+
+Seeds a fresh SQLite database with customers, products, orders and
+order_products rows. The sizes come from --scale and can be overridden with
+--customers/--products/--orders/--items-per-order. Each route then gets the
+same number of requests in one or both modes:
+
+  client   sequentially through the Flask test client, in this process
+  server   from --threads concurrent clients against a threaded werkzeug
+           server running in its own process
+
+Each route reports:
+  - requests/sec
+  - p50/p95/p99 latency
+  - the status codes seen
+  - SQL statements per request: count_queries() in client mode, the server's
+    /metrics in server mode. /metrics logs a streamed response before its
+    body (and query) runs, so ?stream= routes show 0 in server mode
+  - how much the RSS of the process serving the requests grew while the
+    route ran (rss_delta_mb; needs /proc), and that process's peak RSS so far
+    (process_peak_rss_mb). The peak covers the whole process, seeding and
+    earlier routes included, so only the delta belongs to the route
+
+The response cache is off unless --cache is given, so every request reaches
+the database. Each mode starts from a fresh copy of the seeded database, so
+the server doesn't replay the client's writes (e.g. adding the same product
+to the same order again). Within a mode the write routes run after the reads,
+and DELETE routes only remove rows created for them beforehand.
+
+Results are saved as JSON (bench/results/<time>-<scale>.json by default).
+--baseline compares this run with an earlier result and --diff compares two
+saved files. A route is flagged when:
+  - p95 or req/s is worse by more than --threshold
+  - it runs more SQL statements per request
+  - it returns more errors (5xx)
+The command then exits with status 1, so it can gate CI.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func, insert, select # noqa: E402
+
+from instrumentation import count_queries # noqa: E402
+from main import create_app # noqa: E402
+from models import Customer, Orders, Products, db, order_products # noqa: E402
+
+try:
+    import resource # not available on Windows
+except ImportError:
+    resource = None
+
+# rows in `orders`; customers and products default to a tenth of that
+SCALES = {'1k': 1000, '100k': 100_000, '1m': 1_000_000}
+SEED_BATCH = 50_000
+BULK_SIZE = 10 # rows per /bulk request
+
+SERVER = """
+import sys
+from werkzeug.serving import make_server
+from main import create_app
+make_server('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True).serve_forever()
+"""
+
+
+#========== DATA ==========
+
+def chunks(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == SEED_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(volumes):
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    tables = [
+        (Customer, ({"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(volumes['customers']))),
+        (Products, ({"product_name": f"product {i}", "price": round(rng.uniform(1, 100), 2)} for i in range(volumes['products']))),
+        (Orders, ({"order_date": start + timedelta(days=i % 365), "customer_id": rng.randint(1, volumes['customers'])} for i in range(volumes['orders']))),
+        (order_products, ({"order_id": order_id, "product_id": product_id}
+                          for order_id in range(1, volumes['orders'] + 1)
+                          for product_id in rng.sample(range(1, volumes['products'] + 1), min(volumes['items_per_order'], volumes['products'])))),
+    ]
+    for table, rows in tables:
+        for batch in chunks(rows):
+            db.session.execute(insert(table), batch)
+        db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+# Rows for a DELETE route to remove (orders with two products, products that are in an order); returns their ids
+def create_victims(table, count):
+    last_id = db.session.scalar(select(func.max(table.id))) or 0
+    if table is Customer:
+        rows = [{"name": "to delete", "email": "delete@example.com", "address": "-"} for _ in range(count)]
+    elif table is Products:
+        rows = [{"product_name": "to delete", "price": 1.0} for _ in range(count)]
+    else:
+        rows = [{"order_date": date(2024, 1, 1), "customer_id": 1} for _ in range(count)]
+    db.session.execute(insert(table), rows)
+    ids = list(db.session.execute(select(table.id).where(table.id > last_id)).scalars())
+    if table is Orders:
+        db.session.execute(insert(order_products), [{"order_id": id, "product_id": product_id} for id in ids for product_id in (1, 2)])
+    elif table is Products:
+        db.session.execute(insert(order_products), [{"order_id": 1, "product_id": id} for id in ids])
+    db.session.commit()
+    return ids
+
+
+# Put the freshly seeded database back: drop the last run's WAL files and copy `pristine` over `db_file`
+def restore(app, pristine, db_file):
+    with app.app_context():
+        db.engine.dispose()
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    shutil.copyfile(pristine, db_file)
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('PRAGMA journal_mode=WAL') # lets the server's threads read while another writes
+
+
+#========== WORKLOAD ==========
+
+# Random request parameters shared by the client threads
+class Workload:
+    def __init__(self, volumes):
+        self.volumes = volumes
+        self.rng = random.Random(1)
+        self.lock = threading.Lock()
+        self.victims = []
+        self.counter = 0
+
+    def id(self, table):
+        with self.lock:
+            return self.rng.randint(1, self.volumes[table])
+
+    def ids(self, table, count):
+        with self.lock:
+            return self.rng.sample(range(1, self.volumes[table] + 1), min(count, self.volumes[table]))
+
+    def next(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def take(self, count=1):
+        with self.lock:
+            taken, self.victims = self.victims[:count], self.victims[count:]
+            return taken
+
+    def month(self):
+        with self.lock:
+            start = date(2024, 1, 1) + timedelta(days=30 * self.rng.randrange(11))
+        return f"from={start.isoformat()}&to={(start + timedelta(days=30)).isoformat()}"
+
+
+def customer_body(n):
+    return {"name": f"bench {n}", "email": f"bench{n}@example.com", "address": f"{n} Bench St"}
+
+
+def product_body(n):
+    return {"product_name": f"bench {n}", "price": round(1 + n % 100 * 0.5, 2)}
+
+
+# One benchmarked request shape: make(w) returns (path, json body) or None once there is nothing left to send.
+# `victims` is the table whose rows a DELETE route removes, `per_request` how many it removes per request
+class Route:
+    def __init__(self, method, rule, make, variant='', victims=None, per_request=1):
+        self.method = method
+        self.rule = rule
+        self.make = make
+        self.name = f"{method} {rule}{variant}"
+        self.victims = victims
+        self.per_request = per_request
+
+
+def deleting(path):
+    def make(w):
+        ids = w.take()
+        return (path.format(ids[0]), None) if ids else None
+    return make
+
+
+def bulk_deleting(path):
+    def make(w):
+        ids = w.take(BULK_SIZE)
+        return (path, {"ids": ids}) if ids else None
+    return make
+
+
+ROUTES = [
+    # reads
+    Route('GET', '/', lambda w: ('/', None)),
+    Route('GET', '/health/db', lambda w: ('/health/db', None)),
+    Route('GET', '/metrics/pool', lambda w: ('/metrics/pool', None)),
+    Route('GET', '/metrics', lambda w: ('/metrics', None)),
+    Route('GET', '/customers', lambda w: (f'/customers?after_id={w.id("customers")}', None)),
+    Route('GET', '/customers', lambda w: (f'/customers?email=c{w.id("customers") - 1}@example.com', None), '?email='),
+    Route('GET', '/customers/<int:id>', lambda w: (f'/customers/{w.id("customers")}', None)),
+    Route('GET', '/customers/<int:id>/summary', lambda w: (f'/customers/{w.id("customers")}/summary', None)),
+    Route('GET', '/products', lambda w: (f'/products?after_id={w.id("products")}', None)),
+    Route('GET', '/products', lambda w: ('/products?sort=-price', None), '?sort=-price'),
+    Route('GET', '/products', lambda w: (f'/products?name_prefix=product%20{w.id("products")}', None), '?name_prefix='),
+    Route('GET', '/products/<int:id>', lambda w: (f'/products/{w.id("products")}', None)),
+    Route('GET', '/orders', lambda w: (f'/orders?after_id={w.id("orders")}', None)),
+    Route('GET', '/orders', lambda w: (f'/orders?after_id={w.id("orders")}&expand=products,customer', None), '?expand=products,customer'),
+    Route('GET', '/orders', lambda w: (f'/orders?customer_id={w.id("customers")}&sort=-order_date', None), '?customer_id=&sort=-order_date'),
+    Route('GET', '/orders', lambda w: (f'/orders?stream=ndjson&customer_id={w.id("customers")}', None), '?stream=ndjson&customer_id='),
+    Route('GET', '/orders/<int:id>', lambda w: (f'/orders/{w.id("orders")}', None)),
+    Route('GET', '/orders/<int:order_id>/products', lambda w: (f'/orders/{w.id("orders")}/products', None)),
+    Route('GET', '/orders/<int:order_id>/total', lambda w: (f'/orders/{w.id("orders")}/total', None)),
+    Route('GET', '/reports/sales', lambda w: (f'/reports/sales?group_by=day&{w.month()}', None), '?group_by=day'),
+    Route('GET', '/reports/sales', lambda w: (f'/reports/sales?group_by=product&{w.month()}', None), '?group_by=product'),
+    Route('GET', '/reports/sales', lambda w: (f'/reports/sales?group_by=customer&{w.month()}', None), '?group_by=customer'),
+
+    # writes
+    Route('POST', '/customers', lambda w: ('/customers', customer_body(w.next()))),
+    Route('PUT', '/customers/<int:id>', lambda w: (f'/customers/{w.id("customers")}', customer_body(w.next()))),
+    Route('POST', '/customers/bulk', lambda w: ('/customers/bulk', [customer_body(w.next()) for _ in range(BULK_SIZE)])),
+    Route('PUT', '/customers/bulk', lambda w: ('/customers/bulk', [{"id": id, **customer_body(w.next())} for id in w.ids('customers', BULK_SIZE)])),
+    Route('POST', '/products', lambda w: ('/products', product_body(w.next()))),
+    Route('PUT', '/products/<int:id>', lambda w: (f'/products/{w.id("products")}', product_body(w.next()))),
+    Route('POST', '/products/bulk', lambda w: ('/products/bulk', [product_body(w.next()) for _ in range(BULK_SIZE)])),
+    Route('PUT', '/products/bulk', lambda w: ('/products/bulk', [{"id": id, **product_body(w.next())} for id in w.ids('products', BULK_SIZE)])),
+    Route('POST', '/orders', lambda w: ('/orders', {"order_date": "2024-06-01", "customer_id": w.id('customers')})),
+    Route('PUT', '/orders/<int:order_id>/add_product/<int:product_id>', lambda w: (f'/orders/{w.id("orders")}/add_product/{w.id("products")}', None)),
+    Route('PUT', '/orders/<int:order_id>/products', lambda w: (f'/orders/{w.id("orders")}/products', {"product_ids": w.ids('products', 3)})),
+    Route('DELETE', '/orders/<int:order_id>/products', lambda w: (f'/orders/{w.id("orders")}/products', {"product_ids": w.ids('products', 3)})),
+    Route('DELETE', '/orders/<int:id>', deleting('/orders/{}'), victims=Orders),
+    Route('DELETE', '/customers/<int:id>', deleting('/customers/{}'), victims=Customer),
+    Route('DELETE', '/customers/bulk', bulk_deleting('/customers/bulk'), victims=Customer, per_request=BULK_SIZE),
+    Route('DELETE', '/products/<int:id>', deleting('/products/{}'), victims=Products),
+    Route('DELETE', '/products/bulk', bulk_deleting('/products/bulk'), victims=Products, per_request=BULK_SIZE),
+]
+
+
+# (method, rule) pairs of the app that no Route exercises
+def uncovered(app):
+    covered = {(route.method, route.rule) for route in ROUTES}
+    return sorted((method, rule.rule) for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+                  for method in rule.methods - {'HEAD', 'OPTIONS'} if (method, rule.rule) not in covered)
+
+
+#========== RUNNERS ==========
+
+def summarize(latencies, statuses, elapsed, queries, rss_delta, peak_rss):
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": sum(n for status, n in statuses.items() if status == 'error' or int(status) >= 500),
+        "statuses": statuses,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "sql_per_request": round(queries / count, 2) if count else 0.0,
+        "rss_delta_mb": rss_delta,
+        "process_peak_rss_mb": peak_rss,
+    }
+
+
+# A process's current ('VmRSS') or peak ('VmHWM') resident set size in MB, or None without /proc
+def proc_rss(pid='self', field='VmRSS'):
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith(f'{field}:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+
+
+def rss_delta(before, after):
+    return None if before is None or after is None else round(after - before, 1)
+
+
+def own_peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1) # bytes on macOS, KiB elsewhere
+
+
+# Every request through the test client, one after another
+class ClientRunner:
+    mode = 'client'
+
+    def __init__(self, app):
+        self.client = app.test_client()
+        with app.app_context():
+            self.engine = db.engine
+
+    def run(self, route, w, count, warmup):
+        for _ in range(warmup):
+            self.send(route, route.make(w))
+
+        latencies, statuses = [], {}
+        rss_before = proc_rss()
+        with count_queries(self.engine) as queries:
+            start = time.perf_counter()
+            for _ in range(count):
+                request = route.make(w)
+                if request is None:
+                    break
+                began = time.perf_counter()
+                status = self.send(route, request)
+                latencies.append(time.perf_counter() - began)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            elapsed = time.perf_counter() - start
+        return summarize(latencies, statuses, elapsed, queries.count, rss_delta(rss_before, proc_rss()), own_peak_rss())
+
+    def send(self, route, request):
+        path, body = request
+        response = self.client.open(path, method=route.method, json=body)
+        response.get_data() # drain streamed bodies
+        return response.status_code
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+METRIC_LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+# {(metric, method, route): value} summed over any other labels
+def parse_metrics(text):
+    values = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match and match.group(1) in ('http_requests_total', 'db_queries_total'):
+            labels = dict(LABEL.findall(match.group(2)))
+            key = (match.group(1), labels.get('method'), labels.get('route'))
+            values[key] = values.get(key, 0) + float(match.group(3))
+    return values
+
+
+# Concurrent clients against a threaded werkzeug server in a separate process
+class ServerRunner:
+    mode = 'server'
+
+    def __init__(self, env, threads):
+        self.port = free_port()
+        self.threads = threads
+        self.process = subprocess.Popen([sys.executable, '-c', SERVER, str(self.port)], cwd=ROOT, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.close()
+                    raise RuntimeError("benchmark server did not start")
+                time.sleep(0.1)
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+    def send(self, route, request):
+        path, body = request
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            connection.request(route.method, path.replace(' ', '%20'), json.dumps(body) if body is not None else None, headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except OSError:
+            return 'error'
+        finally:
+            connection.close()
+
+    def metrics(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            connection.request('GET', '/metrics')
+            return parse_metrics(connection.getresponse().read().decode())
+        finally:
+            connection.close()
+
+    def run(self, route, w, count, warmup):
+        for _ in range(warmup):
+            self.send(route, route.make(w))
+
+        latencies, statuses = [], {}
+        remaining = [count]
+        lock = threading.Lock()
+
+        def client():
+            while True:
+                with lock:
+                    if remaining[0] == 0:
+                        return
+                    remaining[0] -= 1
+                request = route.make(w)
+                if request is None:
+                    return
+                began = time.perf_counter()
+                status = self.send(route, request)
+                elapsed = time.perf_counter() - began
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        before = self.metrics()
+        rss_before = proc_rss(self.process.pid)
+        threads = [threading.Thread(target=client) for _ in range(self.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        after = self.metrics()
+        rss_after = proc_rss(self.process.pid)
+
+        def delta(metric):
+            key = (metric, route.method, route.rule)
+            return after.get(key, 0) - before.get(key, 0)
+
+        handled = delta('http_requests_total')
+        queries = delta('db_queries_total') * len(latencies) / handled if handled else 0 # per request, scaled to our count
+        return summarize(latencies, statuses, elapsed, queries, rss_delta(rss_before, rss_after),
+                         proc_rss(self.process.pid, 'VmHWM'))
+
+
+#========== COMPARISON ==========
+
+# Regressions of `current` against `baseline`, as printable lines
+def compare(baseline, current, threshold):
+    if baseline.get('volumes') != current.get('volumes'):
+        print(f"warning: data volumes differ ({baseline.get('volumes')} vs {current.get('volumes')})")
+    regressions = []
+    for mode, routes in current['results'].items():
+        for name, new in routes.items():
+            old = baseline['results'].get(mode, {}).get(name)
+            if old is None or not new['requests'] or not old['requests']:
+                continue
+            checks = [
+                ('p95', new['p95_ms'] > old['p95_ms'] * (1 + threshold) and new['p95_ms'] - old['p95_ms'] > 0.5,
+                 f"{old['p95_ms']:.2f} -> {new['p95_ms']:.2f} ms"),
+                ('req/s', new['rps'] < old['rps'] * (1 - threshold), f"{old['rps']:.1f} -> {new['rps']:.1f}"),
+                ('sql/request', new['sql_per_request'] > old['sql_per_request'] + 0.5,
+                 f"{old['sql_per_request']:g} -> {new['sql_per_request']:g}"),
+                ('errors', new['errors'] > old['errors'], f"{old['errors']} -> {new['errors']}"),
+            ]
+            regressions += [f"{mode:>6}  {name}  {what} {change}" for what, failed, change in checks if failed]
+    return regressions
+
+
+def report_regressions(regressions):
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+#========== MAIN ==========
+
+def print_row(mode, name, result):
+    delta = result['rss_delta_mb']
+    print(f"{mode:>6}  {name:<58} {result['requests']:>5} req {result['rps']:>8.1f}/s  "
+          f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+          f"sql {result['sql_per_request']:>5g}  rss {'?' if delta is None else f'{delta:+.1f}'} MB (process peak {result['process_peak_rss_mb']} MB)  "
+          f"{result['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='1k')
+    parser.add_argument('--customers', type=int)
+    parser.add_argument('--products', type=int)
+    parser.add_argument('--orders', type=int)
+    parser.add_argument('--items-per-order', type=int, default=3)
+    parser.add_argument('--mode', choices=('client', 'server', 'both'), default='both')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per read route')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients in server mode')
+    parser.add_argument('--routes', help='only run routes whose name contains this text')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--order-totals', action='store_true', help='turn ORDER_TOTALS_SUMMARY on')
+    parser.add_argument('--output', help='where to save the JSON results')
+    parser.add_argument('--baseline', help='earlier JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown before flagging')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), help='only compare two saved results')
+    args = parser.parse_args()
+
+    if args.diff:
+        with open(args.diff[0]) as old, open(args.diff[1]) as new:
+            report_regressions(compare(json.load(old), json.load(new), args.threshold))
+        return
+
+    rows = SCALES[args.scale]
+    volumes = {
+        'customers': args.customers or max(10, rows // 10),
+        'products': args.products or max(10, rows // 10),
+        'orders': args.orders or rows,
+        'items_per_order': args.items_per_order,
+    }
+    db_file = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file}',
+        'CACHE_BACKEND': 'memory' if args.cache else 'none',
+        'ORDER_TOTALS_SUMMARY': args.order_totals,
+    }
+    app = create_app(config)
+    logging.getLogger('instrumentation').setLevel(logging.ERROR) # seeding and big reports would flood the slow query log
+
+    print(f"seeding {volumes} ...")
+    start = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        seed(volumes)
+        if args.order_totals:
+            from reports import rebuild_order_totals
+            rebuild_order_totals()
+        db.engine.dispose()
+    pristine = f'{db_file}.seeded'
+    shutil.copyfile(db_file, pristine)
+    print(f"seeded in {time.perf_counter() - start:.1f}s")
+
+    missing = uncovered(app)
+    if missing:
+        print("not covered by this benchmark:", ', '.join(f"{method} {rule}" for method, rule in missing))
+
+    routes = [route for route in ROUTES if not args.routes or args.routes in route.name]
+    results = {}
+    modes = ('client', 'server') if args.mode == 'both' else (args.mode,)
+    for mode in modes:
+        restore(app, pristine, db_file)
+        if mode == 'client':
+            runner = ClientRunner(app)
+        else:
+            env = {**os.environ, 'DATABASE_URL': config['SQLALCHEMY_DATABASE_URI'],
+                   'FLASK_CACHE_BACKEND': config['CACHE_BACKEND'], 'FLASK_INSTRUMENTATION': 'true',
+                   'FLASK_ORDER_TOTALS_SUMMARY': json.dumps(args.order_totals)}
+            runner = ServerRunner(env, args.threads)
+        try:
+            results[mode] = {}
+            for route in routes:
+                w = Workload(volumes)
+                if route.victims is not None:
+                    with app.app_context():
+                        w.victims = create_victims(route.victims, args.requests * route.per_request)
+                warmup = args.warmup if route.method == 'GET' else 0
+                result = runner.run(route, w, args.requests, warmup)
+                results[mode][route.name] = result
+                print_row(mode, route.name, result)
+        finally:
+            if mode == 'server':
+                runner.close()
+
+    output = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "volumes": volumes,
+        "settings": {"requests": args.requests, "threads": args.threads, "cache": args.cache, "order_totals": args.order_totals},
+        "results": results,
+    }
+    path = args.output or os.path.join(ROOT, 'bench', 'results', f"{datetime.now():%Y%m%d-%H%M%S}-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(output, file, indent=2)
+    print(f"\nresults saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            report_regressions(compare(json.load(file), output, args.threshold))
+
+
+if __name__ == '__main__':
+    main()
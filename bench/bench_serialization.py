@@ -0,0 +1,69 @@
+"""Compare the marshmallow list path with the precompiled RowSerializer path.
+
+    python bench/bench_serialization.py [rows ...]   (default: 10000 100000)
+
+Seeds a throwaway SQLite database, then times "query + dump + encode" for the
+products and customers lists both ways and checks the bytes are identical.
+"""
+import os
+import sys
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select # noqa: E402
+
+from main import create_app # noqa: E402
+from models import Customer, Products, db # noqa: E402
+from schemas import customers_schema, products_schema, row_serializer # noqa: E402
+from serializers import json_response # noqa: E402
+
+
+def seed(rows):
+    db.session.execute(delete(Products))
+    db.session.execute(delete(Customer))
+    db.session.execute(insert(Products), [{"product_name": f"product {i}", "price": i * 1.25} for i in range(rows)])
+    db.session.execute(insert(Customer), [{"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(rows)])
+    db.session.commit()
+
+
+def marshmallow_path(model, list_schema):
+    objects = db.session.execute(select(model).order_by(model.id)).scalars().all()
+    body = list_schema.jsonify(objects).get_data()
+    db.session.expunge_all()
+    return body
+
+
+def fast_path(model):
+    serializer = row_serializer(model)
+    items = serializer.dump_rows(db.session.execute(serializer.select().order_by(model.id)).all())
+    return json_response(items, serializer.float_values(items)).get_data()
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(sizes):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{DB_FILE}'})
+    with app.test_request_context():
+        db.create_all()
+        for rows in sizes:
+            seed(rows)
+            for model, list_schema in ((Products, products_schema), (Customer, customers_schema)):
+                slow, expected = best_of(lambda: marshmallow_path(model, list_schema))
+                fast, actual = best_of(lambda: fast_path(model))
+                status = 'identical' if actual == expected else 'MISMATCH'
+                print(f"{model.__tablename__:>9} {rows:>8} rows  marshmallow {slow * 1000:8.1f} ms  "
+                      f"fast {fast * 1000:8.1f} ms  x{slow / fast:5.1f}  ({status})")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
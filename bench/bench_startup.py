@@ -0,0 +1,48 @@
+"""Measure import -> create_app() -> first response time in fresh interpreters.
+
+    python bench/bench_startup.py [runs]   (default: 10)
+
+Each run starts a new Python process with an in-memory SQLite app, the way a
+test suite or a freshly booted worker would, and reports the median of each step.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+from models import db
+imported = time.perf_counter()
+app = main.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+created = time.perf_counter()
+with app.app_context():
+    db.create_all()
+tables = time.perf_counter()
+response = app.test_client().get('/products')
+assert response.status_code == 200, response.status_code
+first = time.perf_counter()
+print(json.dumps({"import": imported - start, "create_app": created - imported,
+                  "create_all": tables - created, "first_response": first - tables, "total": first - start}))
+"""
+
+
+def run_once():
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs):
+    results = [run_once() for _ in range(runs)]
+    for step in results[0]:
+        values = [result[step] * 1000 for result in results]
+        print(f"{step:>15}: median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms  max {max(values):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,103 @@
+"""Check read-replica routing locally with two SQLite files.
+
+    python bench/check_replica.py
+
+`init-db` only creates tables on the primary, because in production the
+replica gets its schema and rows through replication. To try the replica
+locally, copy the primary file after creating it:
+
+    DATABASE_URL=sqlite:////tmp/primary.db flask --app main init-db
+    cp /tmp/primary.db /tmp/replica.db
+    DATABASE_URL=sqlite:////tmp/primary.db DATABASE_REPLICA_URL=sqlite:////tmp/replica.db flask --app main run
+
+This script does the same with throwaway files. It records which engine runs
+each statement and checks that:
+  - GETs read from the replica
+  - writes go to the primary
+  - a GET right after a write reads the primary (REPLICA_MAX_LAG)
+  - once the replica has caught up, GETs read from it again
+Exits non-zero on the first failed check.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert # noqa: E402
+
+from main import create_app # noqa: E402
+from models import Customer, Products, db # noqa: E402
+
+
+# Names of the engines ('primary' / 'replica') that ran statements during each request
+class EngineLog:
+    def __init__(self, engines):
+        self.used = []
+        for name, engine in engines.items():
+            event.listen(engine, 'before_cursor_execute', self.listener(name or 'primary'))
+
+    def listener(self, name):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.used.append(name)
+        return before_cursor_execute
+
+    def request(self, call):
+        self.used.clear()
+        response = call()
+        response.get_data()
+        return response, set(self.used)
+
+
+def check(label, ok, details=''):
+    print(f"{'ok  ' if ok else 'FAIL'} {label} {details}")
+    if not ok:
+        sys.exit(1)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    primary, replica = os.path.join(directory, 'primary.db'), os.path.join(directory, 'replica.db')
+
+    setup = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}'})
+    with setup.app_context():
+        db.create_all()
+        db.session.execute(insert(Customer), [{"name": "Ada", "email": "ada@example.com", "address": "1 Main St"}])
+        db.session.execute(insert(Products), [{"product_name": "widget", "price": 1.0}])
+        db.session.commit()
+        db.engine.dispose()
+    shutil.copy(primary, replica) # the "replication"
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}', 'DATABASE_REPLICA_URL': f'sqlite:///{replica}',
+                      'CACHE_BACKEND': 'memory', 'REPLICA_MAX_LAG': 1})
+    client = app.test_client()
+    with app.app_context():
+        log = EngineLog(db.engines)
+
+    health = client.get('/health/db').json
+    check("health check sees both engines", set(health) == {'primary', 'replica'}, health)
+
+    response, used = log.request(lambda: client.get('/products/1'))
+    check("GET reads the replica", response.status_code == 200 and used == {'replica'}, used)
+
+    response, used = log.request(lambda: client.put('/products/1', json={"product_name": "widget", "price": 2.0}))
+    check("PUT writes the primary", response.status_code == 200 and used == {'primary'}, used)
+
+    response, used = log.request(lambda: client.get('/products/1'))
+    check("GET right after the write reads the primary", used == {'primary'} and response.json['price'] == 2.0, response.json)
+
+    response, used = log.request(lambda: client.get('/customers/1'))
+    check("GET of an untouched table still reads the replica", used == {'replica'}, used)
+
+    with app.app_context():
+        db.engines['replica'].dispose()
+    shutil.copy(primary, replica) # the replica catches up
+    time.sleep(1.1) # past REPLICA_MAX_LAG
+    response, used = log.request(lambda: client.get('/products?limit=5'))
+    check("GET after the lag window reads the replica again", used == {'replica'} and response.json['items'][0]['price'] == 2.0, used)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Check that the list filters and sorts are served by indexes.
+
+    python bench/explain_indexes.py [rows]   (default: 20000)
+
+Seeds a throwaway SQLite database, requests each filtered/sorted list
+endpoint through the test client, captures the SELECT it runs and prints
+SQLite's EXPLAIN QUERY PLAN for it. Exits non-zero if a query that should
+use an index scans the whole table instead. tests/test_list_filters.py runs
+the same checks under pytest on a smaller table.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert # noqa: E402
+
+from main import create_app # noqa: E402
+from models import Customer, Orders, Products, db # noqa: E402
+
+# (url, index the main query should use)
+CHECKS = [
+    ('/orders?customer_id=7', 'ix_orders_customer_id'),
+    ('/orders?order_date_from=2024-03-01&order_date_to=2024-03-07', 'ix_orders_order_date'),
+    ('/orders?sort=-order_date&limit=20', 'ix_orders_order_date'),
+    ('/orders?sort=order_date&after_id=2024-03-01,500&limit=20', 'ix_orders_order_date'),
+    ('/products?min_price=10&max_price=12', 'ix_products_price'),
+    ('/products?sort=price&limit=20', 'ix_products_price'),
+    ('/products?name_prefix=product%2012', 'ix_products_product_name'),
+    ('/customers?email=c42@example.com', 'ix_customer_email'),
+]
+
+
+def seed(rows):
+    start = date(2024, 1, 1)
+    db.session.execute(insert(Customer), [{"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(rows // 10)])
+    db.session.execute(insert(Products), [{"product_name": f"product {i}", "price": (i % 4000) * 0.01} for i in range(rows)])
+    db.session.execute(insert(Orders), [{"order_date": start + timedelta(days=i % 365), "customer_id": 1 + i % (rows // 10)} for i in range(rows)])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def main(rows):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{DB_FILE}', 'CACHE_BACKEND': 'none', 'INSTRUMENTATION': False})
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        seed(rows)
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        failures = 0
+        for url, index in CHECKS:
+            statements.clear()
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                start = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - start
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            statement, parameters = statements[0]
+            with db.engine.connect() as connection:
+                plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            ok = response.status_code == 200 and any(index in step for step in plan)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {url}  ({len(response.json['items'])} rows, {elapsed * 1000:.1f} ms)")
+            for step in plan:
+                print(f"       {step}")
+
+    if failures:
+        sys.exit(f"{failures} queries did not use their index")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,228 @@
+"""Response cache for the read endpoints.
+
+Serialized JSON bodies are cached under the route path plus its query string.
+Every key also carries the current "generation" of the namespaces the route
+depends on (customers, products, orders). Mutating routes call invalidate(),
+which bumps those generations, so old entries are never read again and simply
+age out of the cache.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+
+from database import read_from_primary
+
+
+#========== BACKENDS ==========
+
+# In-process LRU cache with a TTL per entry
+class LRUCache:
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (expires_at, value), most recently used last
+        self._generations = {} # kept apart from the LRU so they are never evicted
+        self._written = {} # namespace -> time of the last bump
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, namespaces):
+        with self._lock:
+            return [self._generations.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._written[namespace] = time.time()
+
+    def written_since(self, namespaces, since):
+        with self._lock:
+            return any(self._written.get(namespace, 0) >= since for namespace in namespaces)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._written.clear()
+
+
+# Cache on a Redis-protocol server. `client` only needs get/set(ex=)/mget/incr,
+# so redis.Redis or any local stand-in with the same methods works
+class RedisCache:
+    def __init__(self, client, ttl=300, prefix='api-cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis # optional dependency, only needed for CACHE_BACKEND = 'redis'
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def generations(self, namespaces):
+        values = self.client.mget([f'{self.prefix}gen:{namespace}' for namespace in namespaces])
+        return [int(value or 0) for value in values]
+
+    def bump(self, namespace):
+        self.client.incr(f'{self.prefix}gen:{namespace}')
+        self.client.set(f'{self.prefix}written:{namespace}', time.time())
+
+    def written_since(self, namespaces, since):
+        values = self.client.mget([f'{self.prefix}written:{namespace}' for namespace in namespaces])
+        return any(float(value or 0) >= since for value in values)
+
+
+# No caching at all; ETags are still sent so clients can skip re-downloading bodies.
+# Write times are only known within this process
+class NullCache:
+    def __init__(self):
+        self._written = {}
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def generations(self, namespaces):
+        return [0] * len(namespaces)
+
+    def bump(self, namespace):
+        self._written[namespace] = time.time()
+
+    def written_since(self, namespaces, since):
+        return any(self._written.get(namespace, 0) >= since for namespace in namespaces)
+
+
+#========== SETUP ==========
+
+# Attach a cache backend to the app, picked by CACHE_BACKEND ('memory', 'redis' or 'none') unless one is passed in.
+# Generations must be shared by every worker for invalidate() to reach them, so the default is 'redis' when
+# CACHE_REDIS_URL is set and no caching otherwise. 'memory' keeps generations in this process and is refused
+# when WEB_CONCURRENCY says there is more than one worker: other workers would serve stale bodies until CACHE_TTL
+def init_cache(app, backend=None):
+    app.config.setdefault('CACHE_REDIS_URL', None)
+    app.config.setdefault('CACHE_BACKEND', 'redis' if app.config['CACHE_REDIS_URL'] else 'none')
+    app.config.setdefault('CACHE_TTL', 300)
+    app.config.setdefault('CACHE_MAX_ENTRIES', 10000)
+
+    if backend is None:
+        kind = app.config['CACHE_BACKEND']
+        if kind == 'memory':
+            workers = os.environ.get('WEB_CONCURRENCY', '')
+            if workers.isdigit() and int(workers) > 1:
+                raise ValueError(f"CACHE_BACKEND 'memory' is per process and can't be invalidated across {workers} workers; use 'redis'")
+            backend = LRUCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_TTL'])
+        elif kind == 'redis':
+            backend = RedisCache.from_url(app.config['CACHE_REDIS_URL'] or 'redis://localhost:6379/0', ttl=app.config['CACHE_TTL'])
+        elif kind == 'none':
+            backend = NullCache()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {kind!r}")
+
+    app.extensions['response_cache'] = backend
+    return backend
+
+
+def get_cache():
+    return current_app.extensions['response_cache']
+
+
+#========== CACHING & INVALIDATION ==========
+
+def etag_for(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+# Cached entries are b'<etag>\n<mimetype>\n<body>'
+def pack(body, mimetype):
+    return b'\n'.join([etag_for(body).encode(), mimetype.encode(), body])
+
+
+def unpack(entry):
+    etag, mimetype, body = entry.split(b'\n', 2)
+    return etag.decode(), mimetype.decode(), body
+
+
+# `args` is an iterable of (name, value) query string pairs
+def cache_key(path, args, namespaces, generations):
+    versions = '.'.join(f'{namespace}{generation}' for namespace, generation in zip(namespaces, generations))
+    return f'{path}?{urlencode(sorted(args))}|{versions}'
+
+
+def conditional_response(entry):
+    etag, mimetype, body = unpack(entry)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304) # unchanged: no DB hit, no serialization, no body
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    return response
+
+
+# Cache a GET view's 200 responses until one of `namespaces` is invalidated, with ETag / If-None-Match support.
+# Streamed responses (?stream=) are passed through untouched.
+# Within REPLICA_MAX_LAG seconds of a write to `namespaces` a miss reads the primary, so a lagging replica's
+# old rows are never cached under the new generation
+def cached(*namespaces):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            key = cache_key(request.path, request.args.items(multi=True), namespaces, cache.generations(namespaces))
+            entry = cache.get(key)
+
+            if entry is None:
+                if recently_written(cache, namespaces):
+                    read_from_primary()
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = pack(response.get_data(), response.mimetype)
+                cache.set(key, entry)
+
+            return conditional_response(entry)
+        return wrapper
+    return decorator
+
+
+# True if a replica is configured and one of `namespaces` was invalidated within REPLICA_MAX_LAG seconds
+def recently_written(cache, namespaces):
+    config = current_app.config
+    return bool(config.get('DATABASE_REPLICA_URL')) and cache.written_since(namespaces, time.time() - config['REPLICA_MAX_LAG'])
+
+
+# Drop every cached response that depends on any of `namespaces`; call after committing a write
+def invalidate(*namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        cache.bump(namespace)
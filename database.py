@@ -0,0 +1,121 @@
+"""Engine configuration: connection pool options from the environment, pool
+metrics, health checks and read-replica routing for GET requests."""
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else value.lower() in ('1', 'true', 'yes', 'on')
+
+
+#========== POOL ==========
+
+# QueuePool that also records how long checkouts wait and how often they time out
+class MeteredQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start # includes opening a new connection when the pool has none idle
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return connection
+
+
+# SQLALCHEMY_ENGINE_OPTIONS for `url`, read from DB_POOL_* environment variables
+def engine_options(url):
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {} # Flask-SQLAlchemy uses a StaticPool for in-memory SQLite, which takes no pool options
+
+    return {
+        'poolclass': MeteredQueuePool,
+        'pool_size': env_int('DB_POOL_SIZE', 10),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30), # seconds to wait for a free connection
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800), # reconnect before MySQL's wait_timeout drops idle connections
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True), # test connections on checkout instead of failing on stale ones
+    }
+
+
+# Point-in-time pool statistics for one engine
+def pool_stats(engine):
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()), # SQLAlchemy's counter starts at -pool_size; report connections in use beyond pool_size
+    }
+    if isinstance(pool, MeteredQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_ms_total": round(pool.wait_total * 1000, 3),
+            "wait_ms_max": round(pool.wait_max * 1000, 3),
+        })
+    return stats
+
+
+# Run SELECT 1 on the engine; returns (ok, details)
+def check_engine(engine):
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except Exception as e:
+        return False, {"status": "down", "error": str(e)}
+    return True, {"status": "up", "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+#========== READ REPLICA ==========
+
+# Sends GET/HEAD requests to the 'replica' bind (when configured) and everything else to the primary.
+# The replica is expected to be a copy of the primary; replication lag shows up as slightly stale reads,
+# except for requests that called read_from_primary()
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and 'replica' in self._db.engines and reading():
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reading():
+    return has_request_context() and request.method in ('GET', 'HEAD') and not g.get('read_from_primary')
+
+
+# Send the rest of this request's reads to the primary, e.g. when the replica may not have a recent write yet
+def read_from_primary():
+    g.read_from_primary = True
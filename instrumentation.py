@@ -0,0 +1,265 @@
+"""Performance instrumentation: SQL statement counting for tests/benchmarks and
+per-request metrics (query count, DB time, serialization time, response size)
+reported as Server-Timing headers and a Prometheus-text /metrics endpoint."""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_app_context, request, request_finished, request_started
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+from database import pool_stats
+
+logger = logging.getLogger(__name__)
+
+
+#========== QUERY COUNTING ==========
+
+# Collects every SQL statement sent to the database while active
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+# Count SQL statements executed on `engine` inside the with block
+#   with count_queries(db.engine) as queries:
+#       client.get('/orders?expand=products')
+#   print(queries.count)
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+# Fail with the list of statements if the with block does not run exactly `expected` SQL statements
+@contextmanager
+def assert_num_queries(engine, expected):
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count != expected:
+        executed = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(counter.statements, 1))
+        raise AssertionError(f"Expected {expected} SQL statements, got {counter.count}:\n{executed}")
+
+
+#========== PER-REQUEST STATS ==========
+
+# Timings for the current request, kept on flask.g
+class RequestStats:
+    __slots__ = ('start', 'queries', 'db_time', 'serialize_time', 'serialize_depth')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_depth = 0
+
+
+def current_stats():
+    return g.get('perf_stats') if has_app_context() else None
+
+
+# Time a block as serialization for the current request; nested blocks (a schema dump inside jsonify) count once
+@contextmanager
+def serialization_timer():
+    stats = current_stats()
+    if stats is None or stats.serialize_depth:
+        yield
+        return
+    stats.serialize_depth = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - start
+        stats.serialize_depth = 0
+
+
+# Schema mixin that counts dump() as serialization time
+class TimedDumpMixin:
+    def dump(self, obj, *, many=None):
+        with serialization_timer():
+            return super().dump(obj, many=many)
+
+
+# Default JSON provider whose encoding time counts as serialization time; output is unchanged
+class TimedJSONProvider(DefaultJSONProvider):
+    matches_default_output = True # serializers.py may still use orjson in its place
+
+    def dumps(self, obj, **kwargs):
+        with serialization_timer():
+            return super().dumps(obj, **kwargs)
+
+
+#========== METRICS ==========
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def label_string(labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels)
+
+
+# Process-wide counters and per-route latency histograms, rendered in Prometheus text format
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.requests = {} # (method, route, status) -> count
+        self.latency = {} # (method, route) -> [bucket counts..., sum, count]
+        self.route_totals = {} # (method, route) -> [queries, db seconds, serialize seconds, response bytes]
+        self.slow_queries = 0
+
+    def observe(self, method, route, status, elapsed, stats, size):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    histogram[i] += 1
+            histogram[-2] += elapsed
+            histogram[-1] += 1
+
+            totals = self.route_totals.setdefault(key, [0, 0.0, 0.0, 0])
+            totals[0] += stats.queries
+            totals[1] += stats.db_time
+            totals[2] += stats.serialize_time
+            totals[3] += size or 0
+
+    def slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self, pools=None):
+        with self._lock:
+            lines = ['# HELP http_requests_total Requests handled, by route and status.',
+                     '# TYPE http_requests_total counter']
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{label_string([("method", method), ("route", route), ("status", status)])}}} {count}')
+
+            lines += ['# HELP http_request_duration_seconds Request latency, by route.',
+                      '# TYPE http_request_duration_seconds histogram']
+            for (method, route), histogram in sorted(self.latency.items()):
+                labels = [('method', method), ('route', route)]
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'http_request_duration_seconds_bucket{{{label_string(labels + [("le", bound)])}}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{label_string(labels + [("le", "+Inf")])}}} {histogram[-1]}')
+                lines.append(f'http_request_duration_seconds_sum{{{label_string(labels)}}} {histogram[-2]}')
+                lines.append(f'http_request_duration_seconds_count{{{label_string(labels)}}} {histogram[-1]}')
+
+            for i, (name, help_text) in enumerate([
+                ('db_queries_total', 'SQL statements executed, by route.'),
+                ('db_time_seconds_total', 'Time spent in SQL statements, by route.'),
+                ('serialization_seconds_total', 'Time spent dumping and encoding responses, by route.'),
+                ('response_bytes_total', 'Response body bytes, by route.'),
+            ]):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (method, route), totals in sorted(self.route_totals.items()):
+                    lines.append(f'{name}{{{label_string([("method", method), ("route", route)])}}} {totals[i]}')
+
+            lines += ['# HELP db_slow_queries_total SQL statements slower than SLOW_QUERY_MS.',
+                      '# TYPE db_slow_queries_total counter',
+                      f'db_slow_queries_total {self.slow_queries}']
+
+        for name, stats in sorted((pools or {}).items()):
+            for key in ('checked_out', 'overflow', 'wait_ms_total', 'timeouts'):
+                if key in stats:
+                    lines.append(f'db_pool_{key}{{{label_string([("engine", name)])}}} {stats[key]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+#========== FLASK INTEGRATION ==========
+
+# Hooks SQLAlchemy cursor events and Flask request signals for one app:
+#   - Server-Timing: db;dur=..;desc="N queries", serialize;dur=.., total;dur=..
+#   - GET /metrics in Prometheus text format
+#   - statements slower than SLOW_QUERY_MS are logged as warnings
+class Instrumentation:
+    def __init__(self, app=None, db=None):
+        self.metrics = Metrics()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('INSTRUMENTATION', True)
+        app.config.setdefault('SERVER_TIMING', True)
+        app.config.setdefault('SLOW_QUERY_MS', 200)
+        if not app.config['INSTRUMENTATION']:
+            return
+
+        self.db = db
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.server_timing = app.config['SERVER_TIMING']
+        app.extensions['instrumentation'] = self
+        app.json = TimedJSONProvider(app)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+        request_started.connect(self.request_started, app)
+        request_finished.connect(self.request_finished, app)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+    # The start time lives on the statement's execution context, not the connection: after_cursor_execute doesn't
+    # fire when a statement fails, and a per-connection stack would keep that entry for the pooled connection's lifetime
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.perf_query_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.record_query(time.perf_counter() - context.perf_query_start, statement)
+
+    # Count one SQL statement for the current request and log it if slow (asgi.py calls this for its async queries)
+    def record_query(self, elapsed, statement):
+        stats = current_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+        if elapsed >= self.slow_query_seconds:
+            self.metrics.slow_query()
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, str(statement)[:1000])
+
+    def request_started(self, sender, **extra):
+        g.perf_stats = RequestStats()
+
+    def request_finished(self, sender, response, **extra):
+        stats = g.pop('perf_stats', None)
+        if stats is None:
+            return
+        route = request.url_rule.rule if request.url_rule else '<unmatched>' # raw paths would make unbounded label sets
+        timing = self.finish(request.method, route, response.status_code, stats, response.calculate_content_length())
+        if timing:
+            response.headers['Server-Timing'] = timing
+
+    # Record a finished request in the metrics; returns its Server-Timing header value, or None if those are off
+    def finish(self, method, route, status, stats, size):
+        elapsed = time.perf_counter() - stats.start
+        self.metrics.observe(method, route, status, elapsed, stats, size)
+        if not self.server_timing:
+            return None
+        return (f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", '
+                f'serialize;dur={stats.serialize_time * 1000:.2f}, total;dur={elapsed * 1000:.2f}')
+
+    def metrics_view(self):
+        pools = {name or 'primary': pool_stats(engine) for name, engine in self.db.engines.items()}
+        return Response(self.metrics.render(pools), mimetype='text/plain; version=0.0.4')
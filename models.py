@@ -0,0 +1,75 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from flask_marshmallow import Marshmallow
+from datetime import date
+from typing import List
+from database import RoutingSession
+
+
+# Create base model
+class Base(DeclarativeBase):
+    pass
+
+# SQLAlchemy and Marshmallow extensions - bound to an app in create_app()
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession}) # RoutingSession picks primary or replica per request
+ma = Marshmallow()
+
+#========== MODELS ==========
+
+class Customer(Base):
+
+    __tablename__ = 'customer'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(db.String(225), nullable=False)
+    email: Mapped[str] = mapped_column(db.String(225), index=True)
+    address: Mapped[str] = mapped_column(db.String(225))
+
+    # one-to-many relationship with Orders
+    orders: Mapped[List["Orders"]] = db.relationship(back_populates="customer") # ensures access from both ends of relationship
+
+# Association Table - facilitates one order to many products, or many products to one order (many-to-many)
+# (order_id, product_id) is the primary key, so the DB indexes membership and rejects duplicate links.
+# Existing databases need: ALTER TABLE order_products ADD PRIMARY KEY (order_id, product_id) (after removing duplicate rows)
+order_products = db.Table(
+    "order_products",
+    Base.metadata,
+    db.Column('order_id', db.ForeignKey('orders.id'), primary_key=True), 
+    db.Column('product_id', db.ForeignKey('products.id'), primary_key=True) 
+)
+
+
+
+class Orders(Base):
+    __tablename__ = 'orders' 
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    order_date: Mapped[date] = mapped_column(db.Date, nullable=False, index=True)
+    customer_id: Mapped[int] = mapped_column(db.ForeignKey('customer.id'), index=True)
+    # many-to-one relationship with Customer
+    customer: Mapped['Customer'] = db.relationship(back_populates="orders")
+    products: Mapped[List['Products']] = db.relationship(secondary=order_products, back_populates="orders")  
+
+
+
+
+class Products(Base):
+    __tablename__ = 'products'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    product_name: Mapped[str] = mapped_column(db.String(225), nullable=False, index=True)
+    price: Mapped[float]  = mapped_column(db.Float, nullable=False, index=True)
+    orders: Mapped[List['Orders']] = db.relationship(secondary=order_products, back_populates="products")
+
+
+# Summary table - item count and total price per order, kept up to date by the order/product write routes
+# when ORDER_TOTALS_SUMMARY is on (see reports.py). It only holds derived data, so order_id has no foreign key
+# and `flask --app main rebuild-order-totals` can recompute it at any time
+order_totals = db.Table(
+    "order_totals",
+    Base.metadata,
+    db.Column('order_id', db.Integer, primary_key=True),
+    db.Column('item_count', db.Integer, nullable=False),
+    db.Column('total', db.Float, nullable=False)
+)
+
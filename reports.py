@@ -0,0 +1,136 @@
+"""Server-side aggregates: order totals, customer spend and sales reports.
+
+An order's total is the sum of the current prices of its products. Every
+aggregate is a single GROUP BY query. It runs either over
+orders/order_products/products or, when ORDER_TOTALS_SUMMARY is on, over the
+order_totals summary table. The order and product write routes keep that
+table up to date by recomputing the rows of just the orders they touched,
+inside their own transaction. Orders the table has no row for yet (e.g.
+before rebuild-order-totals has run) fall back to their live total.
+"""
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+from models import db, Customer, Orders, Products, order_products, order_totals
+
+# ?group_by= values of the sales report
+SALES_GROUPINGS = ('day', 'product', 'customer')
+
+
+def use_summary():
+    return current_app.config['ORDER_TOTALS_SUMMARY']
+
+
+def money(value):
+    return round(float(value or 0), 2)
+
+
+#========== SUMMARY TABLE MAINTENANCE ==========
+
+# (order id, item count, total) for every order, empty orders included
+def order_totals_select():
+    return (select(Orders.id, func.count(order_products.c.product_id), func.coalesce(func.sum(Products.price), 0.0))
+            .outerjoin(order_products, order_products.c.order_id == Orders.id)
+            .outerjoin(Products, Products.id == order_products.c.product_id)
+            .group_by(Orders.id))
+
+
+# Recompute the order_totals rows of `order_ids` (deleted orders lose their row); call before committing the write
+def refresh_order_totals(order_ids):
+    db.session.execute(delete(order_totals).where(order_totals.c.order_id.in_(order_ids)))
+    db.session.execute(insert(order_totals).from_select(
+        ['order_id', 'item_count', 'total'], order_totals_select().where(Orders.id.in_(order_ids))))
+
+
+# Recompute the whole table, e.g. after turning ORDER_TOTALS_SUMMARY on for an existing database
+def rebuild_order_totals():
+    db.session.execute(delete(order_totals))
+    db.session.execute(insert(order_totals).from_select(['order_id', 'item_count', 'total'], order_totals_select()))
+    db.session.commit()
+
+
+# Item count and total of an order from the summary table, or computed live if it has no row there.
+# Correlated subqueries on Orders.id, evaluated only for orders missing from order_totals
+def summary_item_count():
+    live = select(func.count()).where(order_products.c.order_id == Orders.id).scalar_subquery()
+    return func.coalesce(order_totals.c.item_count, live)
+
+
+def summary_total():
+    live = (select(func.coalesce(func.sum(Products.price), 0.0))
+            .select_from(order_products)
+            .join(Products, Products.id == order_products.c.product_id)
+            .where(order_products.c.order_id == Orders.id)
+            .scalar_subquery())
+    return func.coalesce(order_totals.c.total, live)
+
+
+# Ids of the orders containing any of `product_ids`
+def orders_containing(product_ids):
+    query = select(order_products.c.order_id).where(order_products.c.product_id.in_(product_ids)).distinct()
+    return set(db.session.execute(query).scalars())
+
+
+#========== AGGREGATES ==========
+
+# {"order_id", "item_count", "total"}, or None if the order doesn't exist
+def order_total(order_id):
+    row = None
+    if use_summary():
+        row = db.session.execute(select(order_totals).where(order_totals.c.order_id == order_id)).first()
+    if row is None: # summary off, or an order the table has not seen yet
+        row = db.session.execute(order_totals_select().where(Orders.id == order_id)).first()
+    if row is None:
+        return None
+    return {"order_id": row[0], "item_count": row[1], "total": money(row[2])}
+
+
+# {"customer_id", "order_count", "lifetime_spend"}, or None if the customer doesn't exist
+def customer_summary(customer_id):
+    if use_summary():
+        query = (select(Customer.id, func.count(Orders.id), func.sum(summary_total()))
+                 .outerjoin(Orders, Orders.customer_id == Customer.id)
+                 .outerjoin(order_totals, order_totals.c.order_id == Orders.id))
+    else:
+        query = (select(Customer.id, func.count(Orders.id.distinct()), func.sum(Products.price))
+                 .outerjoin(Orders, Orders.customer_id == Customer.id)
+                 .outerjoin(order_products, order_products.c.order_id == Orders.id)
+                 .outerjoin(Products, Products.id == order_products.c.product_id))
+    row = db.session.execute(query.where(Customer.id == customer_id).group_by(Customer.id)).first()
+    if row is None:
+        return None
+    return {"customer_id": row[0], "order_count": row[1], "lifetime_spend": money(row[2])}
+
+
+# Sales between two order dates (inclusive, either may be None) grouped by day, product or customer.
+# Orders without products count towards order_count under day/customer grouping
+def sales_report(group_by, start=None, end=None):
+    if group_by == 'product':
+        key = Products.id
+        query = (select(Products.id, Products.product_name, func.count(), func.sum(Products.price))
+                 .select_from(order_products)
+                 .join(Products, Products.id == order_products.c.product_id)
+                 .join(Orders, Orders.id == order_products.c.order_id))
+    else:
+        key = Orders.order_date if group_by == 'day' else Orders.customer_id
+        if use_summary():
+            query = (select(key, func.count(Orders.id), func.sum(summary_item_count()), func.sum(summary_total()))
+                     .outerjoin(order_totals, order_totals.c.order_id == Orders.id))
+        else:
+            query = (select(key, func.count(Orders.id.distinct()), func.count(order_products.c.product_id), func.sum(Products.price))
+                     .outerjoin(order_products, order_products.c.order_id == Orders.id)
+                     .outerjoin(Products, Products.id == order_products.c.product_id))
+
+    if start is not None:
+        query = query.where(Orders.order_date >= start)
+    if end is not None:
+        query = query.where(Orders.order_date <= end)
+    rows = db.session.execute(query.group_by(key).order_by(key)).all()
+
+    if group_by == 'product':
+        return [{"product_id": id, "product_name": name, "order_count": count, "revenue": money(revenue)}
+                for id, name, count, revenue in rows]
+    key_name = 'day' if group_by == 'day' else 'customer_id'
+    return [{key_name: value.isoformat() if group_by == 'day' else value, "order_count": orders,
+             "item_count": int(items or 0), "revenue": money(revenue)}
+            for value, orders, items, revenue in rows]
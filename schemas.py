@@ -0,0 +1,62 @@
+from functools import cache
+from types import SimpleNamespace
+from models import Customer, Orders, Products, ma
+from serializers import RowSerializer
+from instrumentation import TimedDumpMixin
+
+
+#========== SCHEMAS ==========
+
+# Auto schemas introspect their model when the class is created, so the classes are
+# built the first time a schema is used instead of when the app is imported
+@cache
+def schema_classes():
+    # TimedDumpMixin counts dump() time as serialization time for the Server-Timing header and /metrics
+    # Customer Schema
+    class CustomerSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema): # create schema fields based on SQLAlchemy model
+        class Meta:
+            model = Customer
+
+    class ProductSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
+        class Meta:
+            model = Products
+
+    class OrderSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
+        class Meta:
+            model = Orders
+            include_fk = True # to assist Auto Schema in recognizing foreign keys
+
+    # Order with its products and/or customer embedded (?expand=products,customer)
+    class OrderExpandedSchema(OrderSchema):
+        products = ma.Nested(ProductSchema, many=True)
+        customer = ma.Nested(CustomerSchema)
+
+    return SimpleNamespace(CustomerSchema=CustomerSchema, ProductSchema=ProductSchema,
+                           OrderSchema=OrderSchema, OrderExpandedSchema=OrderExpandedSchema)
+
+# Stands in for a schema instance and creates it on first attribute access
+class LazySchema:
+    def __init__(self, class_name, **kwargs):
+        self._class_name = class_name
+        self._kwargs = kwargs
+        self._schema = None
+
+    def __getattr__(self, name):
+        if self._schema is None:
+            self._schema = getattr(schema_classes(), self._class_name)(**self._kwargs)
+        return getattr(self._schema, name)
+
+customer_schema = LazySchema('CustomerSchema')
+customers_schema = LazySchema('CustomerSchema', many=True)
+
+product_schema = LazySchema('ProductSchema')
+products_schema = LazySchema('ProductSchema', many=True)
+
+order_schema = LazySchema('OrderSchema')
+orders_schema = LazySchema('OrderSchema', many=True)
+
+# Precompiled row -> dict function producing the same output as the model's schema, see serializers.py
+@cache
+def row_serializer(model):
+    schema = {Customer: customer_schema, Products: product_schema, Orders: order_schema}[model]
+    return RowSerializer(schema)
@@ -0,0 +1,126 @@
+"""Fast serialization path for the hot read endpoints.
+
+A RowSerializer is compiled once from a marshmallow auto schema: it selects
+the schema's columns as plain tuples (no ORM objects, no identity map) and
+turns each tuple into the same dict schema.dump() would build, using a
+generated function instead of per-field dispatch. json_response() then
+encodes with orjson when it is installed and falls back to Flask's JSON
+provider whenever orjson could produce different bytes, so responses stay
+byte-identical to the marshmallow path.
+"""
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+from sqlalchemy import select
+from instrumentation import serialization_timer
+
+try:
+    import orjson # optional, only used when installed
+except ImportError:
+    orjson = None
+
+
+# How each supported marshmallow field serializes a non-null value (mirrors Field._serialize)
+CONVERTERS = {
+    fields.Integer: 'int({})',
+    fields.Float: 'float({})',
+    fields.String: 'str({})',
+    fields.Date: '{}.isoformat()',
+}
+
+
+# Compiled row -> dict function for a schema whose fields are all plain columns
+class RowSerializer:
+    def __init__(self, schema):
+        model = schema.opts.model
+        table = model.__table__
+        items = []
+        self.columns = []
+        self.float_keys = []
+
+        for name, field in sorted(schema.dump_fields.items(), key=lambda item: item[1].data_key or item[0]):
+            key = field.data_key or name
+            column = table.columns.get(field.attribute or name)
+            converter = CONVERTERS.get(type(field))
+            if column is None or converter is None or getattr(field, 'as_string', False):
+                raise TypeError(f"{model.__name__} schema field {name!r} can't be compiled to a row serializer")
+
+            value = f'row[{len(self.columns)}]'
+            expr = converter.format(value)
+            if column.nullable:
+                expr = f'(None if {value} is None else {expr})' # marshmallow dumps None as null for every field
+            items.append(f'{key!r}: {expr}')
+            self.columns.append(getattr(model, column.key))
+            if type(field) is fields.Float:
+                self.float_keys.append(key)
+
+        self.key_index = next(i for i, column in enumerate(self.columns) if column.primary_key)
+        source = (
+            f"def dump_row(row):\n    return {{{', '.join(items)}}}\n"
+            f"def dump_rows(rows):\n    return [{{{', '.join(items)}}} for row in rows]\n"
+        )
+        namespace = {}
+        exec(compile(source, f'<RowSerializer {model.__name__}>', 'exec'), namespace)
+        self.dump_row = namespace['dump_row']
+        self.dump_rows = namespace['dump_rows']
+
+    # SELECT of just this schema's columns, in the order dump_row expects
+    def select(self):
+        return select(*self.columns)
+
+    # Every float value in the dumped dicts, for the orjson safety check
+    def float_values(self, items):
+        return (item[key] for item in items for key in self.float_keys)
+
+
+#========== JSON ENCODING ==========
+
+# orjson and json.dumps agree on a float unless json would switch to exponent notation or it's nan/inf
+def plain_float(value):
+    return value is None or value == 0 or 1e-4 <= abs(value) < 1e16
+
+
+# Every float in a dumped payload, for payloads that didn't come from a RowSerializer (e.g. nested schemas)
+def find_floats(obj):
+    if isinstance(obj, float):
+        yield obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from find_floats(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from find_floats(value)
+
+
+# True if app.json produces DefaultJSONProvider's output (subclasses opt in with matches_default_output)
+def orjson_compatible(app):
+    provider = app.json
+    default_output = type(provider) is DefaultJSONProvider or getattr(provider, 'matches_default_output', False)
+    return orjson is not None and default_output and provider.sort_keys and provider.ensure_ascii
+
+
+# Compact JSON text, identical to app.json.dumps(obj, separators=(',', ':')).
+# float_values are the floats in obj (RowSerializer.float_values); when None, obj is searched for them
+def dumps(obj, float_values=None):
+    app = current_app._get_current_object()
+    with serialization_timer():
+        if orjson_compatible(app):
+            try:
+                body = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+            except TypeError: # e.g. integers wider than 64 bits
+                body = None
+            # json escapes all non-ASCII and DEL, orjson writes them raw
+            if float_values is None:
+                float_values = find_floats(obj)
+            if body is not None and body.isascii() and b'\x7f' not in body and all(plain_float(value) for value in float_values):
+                return body.decode()
+        return app.json.dumps(obj, separators=(',', ':'))
+
+
+# Same response as jsonify(payload), encoded through dumps()
+def json_response(payload, float_values=None):
+    app = current_app._get_current_object()
+    provider = app.json
+    if provider.compact is False or (provider.compact is None and app.debug):
+        return provider.response(payload) # pretty-printed output in debug mode, not worth a fast path
+    return app.response_class(f"{dumps(payload, float_values)}\n", mimetype=provider.mimetype)
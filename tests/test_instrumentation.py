@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app):
+    with db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM no_such_table'))
+        assert connection.execute(text('SELECT 1')).scalar() == 1
+        assert not connection.info.get('query_start')
+
+
+def test_server_timing_counts_queries(client):
+    response = client.get('/products/1')
+    assert response.status_code == 404
+    assert 'db;dur=' in response.headers['Server-Timing']
+    assert 'desc="1 queries"' in response.headers['Server-Timing']
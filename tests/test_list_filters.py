@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from models import Customer, Orders, Products, db
+
+ROWS = 2000
+
+# (url, index the main query should use)
+INDEXED = [
+    ('/orders?customer_id=7', 'ix_orders_customer_id'),
+    ('/orders?order_date_from=2024-03-01&order_date_to=2024-03-07', 'ix_orders_order_date'),
+    ('/orders?sort=-order_date&limit=20', 'ix_orders_order_date'),
+    ('/orders?sort=order_date&after_id=2024-03-01,500&limit=20', 'ix_orders_order_date'),
+    ('/orders?sort=customer_id&limit=20', 'ix_orders_customer_id'),
+    ('/products?min_price=10&max_price=12', 'ix_products_price'),
+    ('/products?sort=price&limit=20', 'ix_products_price'),
+    ('/products?sort=-product_name&limit=20', 'ix_products_product_name'),
+    ('/products?name_prefix=product%2012', 'ix_products_product_name'),
+    ('/customers?email=c42@example.com', 'ix_customer_email'),
+    ('/customers?sort=email&limit=20', 'ix_customer_email'),
+]
+
+
+def seed(rows=ROWS):
+    start = date(2024, 1, 1)
+    db.session.execute(insert(Customer), [{"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(rows // 10)])
+    # few distinct prices and names with commas, so pages split ties and cursors contain commas
+    db.session.execute(insert(Products), [{"product_name": f"product {i % 300}, size {i % 7}", "price": (i % 40) * 0.25} for i in range(rows)])
+    db.session.execute(insert(Orders), [{"order_date": start + timedelta(days=i % 90), "customer_id": 1 + i % (rows // 10)} for i in range(rows)])
+    db.session.commit()
+
+
+@pytest.fixture
+def seeded(app):
+    seed()
+    db.session.execute(db.text('ANALYZE'))
+    return app
+
+
+# Every item of a list endpoint, following "next" cursors page by page
+def walk(client, path, limit, **args):
+    items, after = [], None
+    while True:
+        response = client.get(path, query_string={**args, 'limit': limit, **({'after_id': after} if after is not None else {})})
+        assert response.status_code == 200, response.json
+        page = response.json
+        items += page['items']
+        after = page['next']
+        if after is None:
+            return items
+
+
+@pytest.mark.parametrize('url, index', INDEXED)
+def test_list_query_uses_index(seeded, client, url, index):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+
+    statement, parameters = statements[0]
+    with db.engine.connect() as connection:
+        plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+    assert any(index in step for step in plan), plan
+
+
+@pytest.mark.parametrize('path, sort', [
+    ('/products', '-price'),
+    ('/products', 'product_name'),
+    ('/products', '-product_name'),
+    ('/orders', 'order_date'),
+    ('/orders', '-customer_id'),
+])
+def test_cursor_pages_cover_every_row_in_order(seeded, client, path, sort):
+    items = walk(client, path, limit=37, sort=sort)
+    ids = [item['id'] for item in items]
+    assert len(ids) == len(set(ids)) == ROWS
+
+    name = sort.lstrip('-')
+    assert items == sorted(items, key=lambda item: (item[name], item['id']), reverse=sort.startswith('-'))
+
+
+def test_stream_matches_pages(seeded, client, app):
+    app.config['STREAM_BATCH_SIZE'] = 64
+    paged = walk(client, '/products', limit=50, sort='product_name', name_prefix='product 1')
+    streamed = client.get('/products', query_string={'sort': 'product_name', 'name_prefix': 'product 1', 'stream': 'json'}).json
+    assert streamed == paged and paged
+
+
+def test_cursor_survives_deleted_row(seeded, client):
+    first = client.get('/products?sort=product_name&limit=10').json
+    last_id = first['items'][-1]['id']
+    assert ',' in first['next']
+    assert client.delete(f'/products/{last_id}').status_code == 200
+
+    after = client.get('/products', query_string={'sort': 'product_name', 'limit': 10, 'after_id': first['next']})
+    assert after.status_code == 200
+    assert after.json['items'][0]['product_name'] >= first['items'][-1]['product_name']
+    stale = client.get('/products', query_string={'sort': 'product_name', 'after_id': last_id})
+    assert stale.status_code == 400
+
+
+def test_name_prefix_filter(seeded, client):
+    items = walk(client, '/products', limit=500, name_prefix='product 12, size 3')
+    assert items and all(item['product_name'].startswith('product 12, size 3') for item in items)
+    assert client.get('/products?name_prefix=%25').json['items'] == [] # LIKE wildcards are literal
+
+
+@pytest.mark.parametrize('url', [
+    '/products?sort=weight',
+    '/products?sort=--price',
+    '/orders?sort=-',
+    '/products?after_id=x',
+    '/products?sort=price&after_id=cheap,3',
+    '/products?sort=price&after_id=1.5,x',
+    '/orders?sort=order_date&after_id=2024-13-01,5',
+    '/products?min_price=free',
+    '/orders?customer_id=seven',
+    '/orders?order_date_from=yesterday',
+    '/products?sort=weight&stream=ndjson',
+    '/products?after_id=x&stream=json',
+])
+def test_bad_list_parameters_return_400(seeded, client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'Error' in response.json
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert, select
+
+import main
+from models import Customer, Orders, Products, db, order_products
+
+
+@pytest.fixture
+def seeded(app):
+    db.session.execute(insert(Customer), [{"name": "Ada", "email": "ada@example.com", "address": "1 Main St"}])
+    db.session.execute(insert(Products), [{"product_name": f"product {i}", "price": 1.0 + i} for i in range(3)])
+    db.session.execute(insert(Orders), [{"order_date": date(2024, 1, 1), "customer_id": 1}])
+    db.session.execute(insert(order_products), [{"order_id": 1, "product_id": 1}])
+    db.session.commit()
+    return app
+
+
+# Make the duplicate check miss links once, as if another request inserted them after our SELECT
+@pytest.fixture
+def racing_check(monkeypatch):
+    real = main.linked_product_ids
+    calls = []
+
+    def linked_product_ids(order_id, product_ids):
+        calls.append(product_ids)
+        return set() if len(calls) == 1 else real(order_id, product_ids)
+
+    monkeypatch.setattr(main, 'linked_product_ids', linked_product_ids)
+    return calls
+
+
+def links():
+    return sorted(db.session.execute(select(order_products.c.product_id).where(order_products.c.order_id == 1)).scalars())
+
+
+def test_add_product_race_returns_400(seeded, client, racing_check):
+    response = client.put('/orders/1/add_product/1')
+    assert response.status_code == 400
+    assert response.json == {"Message": "Product already in order."}
+    assert len(racing_check) == 2
+    assert links() == [1]
+
+
+def test_add_products_race_adds_the_rest(seeded, client, racing_check):
+    response = client.put('/orders/1/products', json={"product_ids": [1, 2, 3]})
+    assert response.status_code == 200
+    assert response.json['added'] == [2, 3] and response.json['already_in_order'] == [1]
+    assert links() == [1, 2, 3]
+
+
+def test_add_existing_product_without_race(seeded, client):
+    assert client.put('/orders/1/add_product/1').status_code == 400
+    assert client.put('/orders/1/add_product/2').status_code == 200
+    assert links() == [1, 2]
@@ -0,0 +1,54 @@
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from instrumentation import assert_num_queries
+from models import Customer, Orders, Products, db, order_products
+
+ORDERS = 60
+
+
+@pytest.fixture
+def seeded(app):
+    rng = random.Random(0)
+    db.session.execute(insert(Customer), [{"name": f"customer {i}", "email": f"c{i}@example.com", "address": f"{i} Main St"} for i in range(8)])
+    db.session.execute(insert(Products), [{"product_name": f"product {i}", "price": 1.25 + i} for i in range(20)])
+    db.session.execute(insert(Orders), [{"order_date": date(2024, 1, 1 + i % 28), "customer_id": 1 + i % 8} for i in range(ORDERS)])
+    # order n has n % 5 products, so pages mix empty and multi-product orders
+    db.session.execute(insert(order_products), [{"order_id": order_id, "product_id": product_id}
+                                                for order_id in range(1, ORDERS + 1)
+                                                for product_id in rng.sample(range(1, 21), order_id % 5)])
+    db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize('limit', [1, 7, 50, 500])
+def test_expanded_order_page_is_two_statements(seeded, client, limit):
+    with assert_num_queries(db.engine, 2): # the page with customers joined in, then one IN query for the products
+        response = client.get(f'/orders?expand=products,customer&limit={limit}')
+    assert response.status_code == 200
+    items = response.json['items']
+    assert len(items) == min(limit, ORDERS)
+    assert all('customer' in item and len(item['products']) == item['id'] % 5 for item in items)
+
+
+@pytest.mark.parametrize('limit', [1, 7, 50])
+def test_expanded_order_page_after_cursor_is_two_statements(seeded, client, limit):
+    with assert_num_queries(db.engine, 2):
+        response = client.get(f'/orders?expand=products,customer&limit={limit}&after_id=5')
+    assert response.json['items'][0]['id'] == 6
+
+
+@pytest.mark.parametrize('order_id', [5, 6, 9]) # 0, 1 and 4 products
+def test_order_products_is_one_statement(seeded, client, order_id):
+    with assert_num_queries(db.engine, 1):
+        response = client.get(f'/orders/{order_id}/products')
+    assert response.status_code == 200
+    assert len(response.json) == order_id % 5
+
+
+def test_missing_order_products_is_one_statement(seeded, client):
+    with assert_num_queries(db.engine, 1):
+        assert client.get('/orders/999/products').status_code == 404
@@ -0,0 +1,33 @@
+import json
+from datetime import date
+
+from sqlalchemy import insert
+
+from models import Customer, Orders, Products, db, order_products
+from serializers import dumps
+
+
+def seed_tiny_price():
+    db.session.execute(insert(Customer), [{"name": "Ada", "email": "ada@example.com", "address": "1 Main St"}])
+    db.session.execute(insert(Products), [{"product_name": "dust", "price": 0.00001}])
+    db.session.execute(insert(Orders), [{"order_date": date(2024, 1, 1), "customer_id": 1}])
+    db.session.execute(insert(order_products), [{"order_id": 1, "product_id": 1}])
+    db.session.commit()
+
+
+def test_nested_floats_match_jsonify(client):
+    seed_tiny_price()
+    assert b'1e-05' in client.get('/products/1').get_data()
+
+    single = client.get('/orders/1?expand=products').get_data() # marshmallow + jsonify, the reference output
+    page = client.get('/orders?expand=products').get_data()
+    stream = client.get('/orders?expand=products&stream=ndjson').get_data()
+    assert b'"price":1e-05' in single
+    assert b'"price":1e-05' in page and b'0.00001' not in page
+    assert b'"price":1e-05' in stream and b'0.00001' not in stream
+    assert json.loads(page)['items'][0] == json.loads(single)
+
+
+def test_dumps_searches_payload_for_floats(app):
+    for payload in ({"items": [{"price": 0.00001}]}, {"items": [{"price": float('nan')}]}, [[1e20]], {"a": 1.5}):
+        assert dumps(payload) == app.json.dumps(payload, separators=(',', ':'))